@@ -1,43 +1,109 @@
+import time
+
+# Taken before the aio_pika/boto3/pydantic/lxml imports so time-to-ready
+# includes them.
+STARTED_AT = time.perf_counter()
+
 import asyncio
 import logging
-from typing import Callable, Dict, TYPE_CHECKING, Coroutine
+import signal
+from typing import Callable, Dict, List, TYPE_CHECKING, Coroutine
 
 from aio_pika import IncomingMessage
 
 from src.processes import XMLMessageProcessor
 from src.config import settings
-from src.consumer import RabbitMQConsumer
+from src.consumer import RabbitMQConsumer, MultiplexedConsumer
+from src.deduplication import build_deduplicator
+from src.replay.recorder import MessageRecorder
+from src.warmup import MerchantActivityTracker, warm_up, report_warm_up_hit_rate
 
 if TYPE_CHECKING:
     ProcessFunc = Callable[[IncomingMessage], Coroutine[None, None, None]]
 
 
-async def run_consumer(queue_name: str, process_func) -> None:
-    consumer = RabbitMQConsumer(queue_name, process_func)
-    await consumer.run()
+async def connect_consumers(consumers: List[RabbitMQConsumer]) -> None:
+    await asyncio.gather(*(consumer.connect() for consumer in consumers))
 
 
 async def main() -> None:
-
     settings.configure_logging(level=logging.INFO)
+    # docker stop sends SIGTERM; cancelling main lets the finally block close
+    # connections and flush the recorder.
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGTERM, asyncio.current_task().cancel
+    )
+
+    activity_tracker = None
+    if settings.WARMUP_STATE_PATH:
+        activity_tracker = MerchantActivityTracker(settings.WARMUP_STATE_PATH)
+
+    xml_processor = XMLMessageProcessor(activity_tracker=activity_tracker)
+    queue_process_map: Dict[str, "ProcessFunc"] = {}
+    if settings.MQ_CONSUME_PER_TYPE_QUEUES:
+        queue_process_map = xml_processor.queue_process_map()
+
+    recorder = None
+    if settings.MQ_RECORD_FILE_PATH:
+        recorder = MessageRecorder(
+            settings.MQ_RECORD_FILE_PATH,
+            redact_merchant_names=settings.MQ_RECORD_REDACT_MERCHANT_NAMES,
+        )
+        logging.info(f"Recording consumed messages to: {settings.MQ_RECORD_FILE_PATH}")
 
-    xml_processor = XMLMessageProcessor()
-    queue_process_map: Dict[str, "ProcessFunc"] = {
-        settings.MQ_CREATE_USER_XML_QUEUE: xml_processor.process_create_user_xml_message,
-        settings.MQ_ADD_NEW_OFFER_TO_XML_QUEUE: xml_processor.process_add_new_offers_to_xml_message,
-        settings.MQ_DELETE_OFFER_XML_QUEUE: xml_processor.process_delete_offers_from_xml_message,
-        settings.MQ_DISABLE_PICKUP_POINT_XML_QUEUE: xml_processor.process_disable_pickup_point_xml_message,
-        settings.MQ_ENABLE_PICKUP_POINT_XML_QUEUE: xml_processor.process_enable_pickup_point_xml_message,
-        settings.MQ_SET_CITY_PRICES_XML_QUEUE: xml_processor.process_set_city_prices_xml_message,
-        settings.MQ_SET_STORE_AVAILABILITY_XML_QUEUE: xml_processor.process_set_store_availability_xml_message,
-        settings.MQ_ADD_STORES_TO_OFFER_XML_QUEUE: xml_processor.process_add_stores_to_offer_xml_message,
-    }
-
-    consumer_tasks = [
-        asyncio.create_task(run_consumer(queue_name, process_func))
+    deduplicator = build_deduplicator()
+
+    consumers = [
+        RabbitMQConsumer(
+            queue_name, process_func, recorder=recorder, deduplicator=deduplicator
+        )
         for queue_name, process_func in queue_process_map.items()
     ]
-    await asyncio.gather(*consumer_tasks)
+    consumers += [
+        MultiplexedConsumer(
+            queue_name,
+            xml_processor.dispatch,
+            recorder=recorder,
+            deduplicator=deduplicator,
+        )
+        for queue_name in settings.ingress_queues
+    ]
+
+    hit_rate_task = None
+    try:
+        _, warm_up_stats = await asyncio.gather(
+            connect_consumers(consumers), warm_up(xml_processor, activity_tracker)
+        )
+        for consumer in consumers:
+            await consumer.start_consuming()
+
+        logging.info(
+            f"Ready in {time.perf_counter() - STARTED_AT:.2f}s, warm-up: {warm_up_stats}"
+        )
+        if warm_up_stats.get("warmed"):
+            hit_rate_task = asyncio.create_task(
+                report_warm_up_hit_rate(
+                    xml_processor.gcp_service.cache,
+                    settings.WARMUP_HIT_RATE_REPORT_SECONDS,
+                )
+            )
+
+        await asyncio.Future()
+    except asyncio.CancelledError:
+        logging.info("Shutdown requested, closing consumers")
+    finally:
+        if hit_rate_task is not None:
+            hit_rate_task.cancel()
+        for consumer in consumers:
+            if consumer.connection is not None:
+                await consumer.connection.close()
+        if recorder is not None:
+            recorder.close()
+        if deduplicator is not None:
+            logging.info(f"Duplicate messages suppressed: {deduplicator.duplicates_count}")
+            deduplicator.close()
+        if activity_tracker is not None:
+            activity_tracker.save()
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 import logging
+from typing import List, Optional
 
 import boto3
 from botocore.client import Config
@@ -30,6 +31,23 @@ class Settings(BaseSettings):
     GCP_SECRET_ACCESS_KEY: str
     GCP_ENDPOINT_URL: str
     GCP_STORAGE_XML_FILE_PATH: str
+    MQ_INGRESS_QUEUE: Optional[str] = None
+    MQ_INGRESS_SHARDS: int = 1
+    MQ_INGRESS_PREFETCH_COUNT: int = 1
+    MQ_CONSUME_PER_TYPE_QUEUES: bool = True
+    MQ_DEDUP_ENABLED: bool = False
+    MQ_DEDUP_WINDOW_SECONDS: float = 600
+    MQ_DEDUP_MAX_ENTRIES: int = 100_000
+    MQ_DEDUP_PERSIST_PATH: Optional[str] = None
+    CATALOG_CACHE_MAX_BYTES: Optional[int] = None
+    WARMUP_STATE_PATH: Optional[str] = None
+    WARMUP_MERCHANTS_COUNT: int = 50
+    WARMUP_MEMORY_BUDGET_BYTES: int = 128 * 1024 * 1024
+    WARMUP_CONCURRENCY: int = 8
+    WARMUP_DEADLINE_SECONDS: float = 20
+    WARMUP_HIT_RATE_REPORT_SECONDS: float = 300
+    MQ_RECORD_FILE_PATH: Optional[str] = None
+    MQ_RECORD_REDACT_MERCHANT_NAMES: bool = True
 
     @property
     def get_boto3_client(self):
@@ -46,6 +64,21 @@ class Settings(BaseSettings):
     def rmq_url(self) -> str:
         return f"amqp://{self.RMQ_USER}:{self.RMQ_PASSWORD}@{self.RMQ_HOST}:{self.RMQ_PORT}/"
 
+    @property
+    def ingress_queues(self) -> List[str]:
+        if not self.MQ_INGRESS_QUEUE:
+            return []
+        if self.MQ_INGRESS_SHARDS <= 1:
+            return [self.MQ_INGRESS_QUEUE]
+        return [f"{self.MQ_INGRESS_QUEUE}.{shard}" for shard in range(self.MQ_INGRESS_SHARDS)]
+
+    @property
+    def catalog_cache_max_bytes(self) -> int:
+        # The cache is off unless sized explicitly or warm-up needs it.
+        if self.CATALOG_CACHE_MAX_BYTES is not None:
+            return self.CATALOG_CACHE_MAX_BYTES
+        return self.WARMUP_MEMORY_BUDGET_BYTES if self.WARMUP_STATE_PATH else 0
+
     @staticmethod
     def configure_logging(level: int = logging.INFO) -> None:
         logging.basicConfig(
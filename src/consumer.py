@@ -5,34 +5,83 @@ from typing import TYPE_CHECKING
 from aio_pika import connect_robust, Message
 from json.decoder import JSONDecodeError
 from lxml.etree import XMLSyntaxError, XPathEvalError, ParseError
+from pydantic import ValidationError
 
 from src.config import settings
+from src.registry import InvalidMessageError
 
 if TYPE_CHECKING:
-    from typing import Callable
+    from typing import Callable, Optional
     from aio_pika import IncomingMessage
+    from src.deduplication import DeduplicationWindow
+    from src.replay.recorder import MessageRecorder
+
+MESSAGE_TYPE_HEADER = "x-message-type"
+IDEMPOTENCY_KEY_HEADER = "x-idempotency-key"
 
 
 class RabbitMQConsumer:
-    def __init__(self, queue_name: str, message_processor: "Callable"):
+    QUEUE_ARGUMENTS = None
+
+    def __init__(
+        self,
+        queue_name: str,
+        message_processor: "Callable",
+        recorder: "Optional[MessageRecorder]" = None,
+        connection_factory: "Callable" = connect_robust,
+        deduplicator: "Optional[DeduplicationWindow]" = None,
+    ):
         self.max_retries = settings.MQ_MESSAGE_MAX_RETRIES_COUNT
+        self.retry_backoff_scale = 1.0
         self.queue_name = queue_name
         self.message_processor = message_processor
+        self.recorder = recorder
+        self.connection_factory = connection_factory
+        self.deduplicator = deduplicator
         self.connection = None
         self.channel = None
         self.queue = None
 
     async def connect(self) -> None:
-        self.connection = await connect_robust(settings.rmq_url)
+        self.connection = await self.connection_factory(settings.rmq_url)
         self.channel = await self.connection.channel()
-        self.queue = await self.channel.declare_queue(self.queue_name, durable=True)
+        self.queue = await self.channel.declare_queue(
+            self.queue_name, durable=True, arguments=self.QUEUE_ARGUMENTS
+        )
         logging.info(f"Queue: {self.queue_name} DECLARE")
 
     async def process_message(self, message: "IncomingMessage") -> None:
+        idempotency_key = self._idempotency_key(message)
+
+        if self.recorder is not None and "x-retry-count" not in message.headers:
+            try:
+                self.recorder.record(
+                    self.queue_name,
+                    message.body,
+                    self._message_type(message),
+                    idempotency_key,
+                )
+            except Exception as exception:
+                logging.error(f"Failed to record message: {str(exception)}")
+
+        if (
+            self.deduplicator is not None
+            and idempotency_key
+            and self.deduplicator.is_duplicate(idempotency_key)
+        ):
+            await message.ack()
+            logging.info(f"Duplicate message acked without processing: {idempotency_key}")
+            return
+
         try:
-            await self.message_processor(message.body)
+            await self._process(message)
+            if self.deduplicator is not None and idempotency_key:
+                self.deduplicator.add(idempotency_key)
             await message.ack()
             logging.info(f"Message processed successfully: {message.message_id}")
+        except InvalidMessageError as invalid_message_error:
+            logging.error(f"Rejecting invalid message: {str(invalid_message_error)}")
+            await message.reject()
         except JSONDecodeError as json_exception:
             logging.error(f"Invalid JSON in message body: {str(json_exception)}")
             await self._handle_retry(message)
@@ -62,6 +111,23 @@ class RabbitMQConsumer:
             logging.error(f"Error processing message: {exception}")
             await self._handle_retry(message)
 
+    async def _process(self, message: "IncomingMessage") -> None:
+        await self.message_processor(message.body)
+
+    @staticmethod
+    def _idempotency_key(message: "IncomingMessage") -> "Optional[str]":
+        idempotency_key = message.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if isinstance(idempotency_key, bytes):
+            idempotency_key = idempotency_key.decode()
+        return idempotency_key or message.message_id
+
+    @staticmethod
+    def _message_type(message: "IncomingMessage") -> "Optional[str]":
+        message_type = message.headers.get(MESSAGE_TYPE_HEADER)
+        if isinstance(message_type, bytes):
+            return message_type.decode()
+        return message_type
+
     async def _handle_retry(self, message: "IncomingMessage") -> None:
         retry_count = int(message.headers.get("x-retry-count", 0))
         if retry_count < self.max_retries:
@@ -74,9 +140,13 @@ class RabbitMQConsumer:
         self, message: "IncomingMessage", retry_count: int
     ) -> None:
         retry_count += 1
-        await asyncio.sleep(2**retry_count)
+        await asyncio.sleep(self.retry_backoff_scale * 2**retry_count)
 
-        new_message = Message(body=message.body, headers={"x-retry-count": retry_count})
+        new_message = Message(
+            body=message.body,
+            headers={**message.headers, "x-retry-count": retry_count},
+            message_id=message.message_id,
+        )
 
         await self.channel.default_exchange.publish(
             new_message, routing_key=self.queue_name
@@ -97,3 +167,63 @@ class RabbitMQConsumer:
             await asyncio.Future()
         finally:
             await self.connection.close()
+
+
+# Ordering guarantee:
+# - Shards are declared with x-single-active-consumer, so however many
+#   replicas subscribe (e.g. during a rolling deploy), RabbitMQ delivers a
+#   shard to one consumer at a time and fails over to another if it drops.
+#   With prefetch 1 that consumer applies first deliveries in publish order.
+#   A delivery unacked at fail-over is redelivered to the next consumer.
+# - Retries are NOT ordered. A failed message waits in a delay queue and is
+#   reapplied after everything published to the shard meanwhile. For one
+#   merchant, an add_new_offers that fails before a later delete_offer is
+#   reapplied after the delete and recreates the offer.
+# - Messages that can never succeed (missing/unknown type, schema-invalid
+#   payload) are rejected at once, dead-lettered if the queue has a DLX.
+class MultiplexedConsumer(RabbitMQConsumer):
+    QUEUE_ARGUMENTS = {"x-single-active-consumer": True}
+
+    async def connect(self) -> None:
+        await super().connect()
+        await self.channel.set_qos(prefetch_count=settings.MQ_INGRESS_PREFETCH_COUNT)
+
+        for retry_count in range(1, self.max_retries + 1):
+            await self.channel.declare_queue(
+                self._retry_queue_name(retry_count),
+                durable=True,
+                arguments={
+                    "x-message-ttl": 1000 * 2**retry_count,
+                    "x-dead-letter-exchange": "",
+                    "x-dead-letter-routing-key": self.queue_name,
+                },
+            )
+
+    def _retry_queue_name(self, retry_count: int) -> str:
+        return f"{self.queue_name}.retry.{retry_count}"
+
+    async def _process(self, message: "IncomingMessage") -> None:
+        try:
+            await self.message_processor(message.body, self._message_type(message))
+        except ValidationError as validation_error:
+            raise InvalidMessageError(str(validation_error)) from validation_error
+
+    async def _retry_message(
+        self, message: "IncomingMessage", retry_count: int
+    ) -> None:
+        # Backoff waits in a TTL queue rather than in this consumer, so the
+        # shard's prefetch slot is released straight away.
+        retry_count += 1
+        new_message = Message(
+            body=message.body,
+            headers={**message.headers, "x-retry-count": retry_count},
+            message_id=message.message_id,
+        )
+
+        await self.channel.default_exchange.publish(
+            new_message, routing_key=self._retry_queue_name(retry_count)
+        )
+        await message.ack()
+        logging.info(
+            f"Message delayed for retry {retry_count}/{self.max_retries}: {message.message_id}"
+        )
@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from src.config import settings
+
+
+class DeduplicationWindow:
+    def __init__(
+        self,
+        window_seconds: float,
+        max_entries: int,
+        persist_path: Optional[str] = None,
+    ):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.duplicates_count = 0
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._file = None
+        self._persisted_lines = 0
+
+        if persist_path:
+            os.makedirs(os.path.dirname(os.path.abspath(persist_path)), exist_ok=True)
+            self._load()
+            self._compact()
+
+    def is_duplicate(self, key: str) -> bool:
+        self._expire(time.time())
+        if key in self._seen:
+            self.duplicates_count += 1
+            return True
+        return False
+
+    def add(self, key: str) -> None:
+        now = time.time()
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        self._expire(now)
+
+        if self._file is not None:
+            self._file.write(self._entry(key, now))
+            self._file.flush()
+            self._persisted_lines += 1
+            if self._persisted_lines > 2 * self.max_entries:
+                self._compact()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._seen:
+            key, seen_at = next(iter(self._seen.items()))
+            if seen_at >= cutoff and len(self._seen) <= self.max_entries:
+                break
+            self._seen.popitem(last=False)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.persist_path):
+            return
+
+        skipped = 0
+        with open(self.persist_path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    seen_at, key = json.loads(line)
+                    seen_at = float(seen_at)
+                except (TypeError, ValueError):
+                    skipped += 1
+                    continue
+                if not isinstance(key, str):
+                    skipped += 1
+                    continue
+                self._seen[key] = seen_at
+                self._seen.move_to_end(key)
+
+        if skipped:
+            logging.warning(f"Skipped {skipped} malformed idempotency entries")
+
+        self._expire(time.time())
+        logging.info(f"Loaded {len(self._seen)} idempotency keys from: {self.persist_path}")
+
+    @staticmethod
+    def _entry(key: str, seen_at: float) -> str:
+        # Keys come from a producer header; JSON escapes newlines in them.
+        return json.dumps([round(seen_at, 3), key]) + "\n"
+
+    def _compact(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+        temp_path = f"{self.persist_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            for key, seen_at in self._seen.items():
+                file.write(self._entry(key, seen_at))
+        os.replace(temp_path, self.persist_path)
+
+        self._persisted_lines = len(self._seen)
+        self._file = open(self.persist_path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def build_deduplicator(persist: bool = True) -> Optional[DeduplicationWindow]:
+    if not settings.MQ_DEDUP_ENABLED:
+        return None
+
+    return DeduplicationWindow(
+        settings.MQ_DEDUP_WINDOW_SECONDS,
+        settings.MQ_DEDUP_MAX_ENTRIES,
+        persist_path=settings.MQ_DEDUP_PERSIST_PATH if persist else None,
+    )
@@ -0,0 +1,45 @@
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Iterator
+
+
+class StageMetrics:
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started_at)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        self.durations[stage].append(seconds)
+
+    def increment(self, counter: str, value: int = 1) -> None:
+        self.counters[counter] += value
+
+    @staticmethod
+    def percentile(values: List[float], percent: float) -> float:
+        if not values:
+            return 0.0
+
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self, percents=(50, 90, 99)) -> Dict[str, Dict[str, float]]:
+        return {
+            stage: {
+                "count": len(values),
+                **{f"p{percent}": self.percentile(values, percent) for percent in percents},
+                "max": max(values),
+            }
+            for stage, values in self.durations.items()
+            if values
+        }
@@ -1,8 +1,11 @@
+import functools
 import logging
-from typing import TYPE_CHECKING, Callable
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Callable, Optional
 
 from src.services import XMLService, GCPUploadService
 from src.config import settings
+from src.registry import OperationRegistry, InvalidMessageError
 from src.schemas import (
     CreateUserSchema,
     AddNewOffersSchema,
@@ -15,103 +18,160 @@ from src.schemas import (
 )
 
 if TYPE_CHECKING:
-    from typing import Any
-    from lxml.etree import Element
+    from typing import Dict
+    from src.metrics import StageMetrics
+    from src.registry import MessageOperation
+    from src.warmup import MerchantActivityTracker
 
 
 class XMLMessageProcessor:
-    def __init__(self):
+    def __init__(
+        self,
+        metrics: Optional["StageMetrics"] = None,
+        activity_tracker: Optional["MerchantActivityTracker"] = None,
+    ):
         self.xml_service = XMLService()
         self.gcp_service = GCPUploadService()
         self.file_path = settings.GCP_STORAGE_XML_FILE_PATH
+        self.metrics = metrics
+        self.activity_tracker = activity_tracker
+        self.registry = self._build_registry()
+
+    def _build_registry(self) -> OperationRegistry:
+        registry = OperationRegistry()
+        registry.register(
+            "create_user",
+            settings.MQ_CREATE_USER_XML_QUEUE,
+            CreateUserSchema,
+            self.xml_service.create_user_xml,
+            requires_catalog=False,
+        )
+        registry.register(
+            "add_new_offers",
+            settings.MQ_ADD_NEW_OFFER_TO_XML_QUEUE,
+            AddNewOffersSchema,
+            self.xml_service.add_offers_to_xml,
+        )
+        registry.register(
+            "delete_offer",
+            settings.MQ_DELETE_OFFER_XML_QUEUE,
+            DeleteOfferSchema,
+            self.xml_service.delete_offer_from_xml,
+        )
+        registry.register(
+            "disable_pickup_point",
+            settings.MQ_DISABLE_PICKUP_POINT_XML_QUEUE,
+            DisablePickupSchema,
+            self.xml_service.disable_pickup_point_xml,
+        )
+        registry.register(
+            "enable_pickup_point",
+            settings.MQ_ENABLE_PICKUP_POINT_XML_QUEUE,
+            EnablePickupSchema,
+            self.xml_service.enable_pickup_point_xml,
+        )
+        registry.register(
+            "set_city_prices",
+            settings.MQ_SET_CITY_PRICES_XML_QUEUE,
+            SetOfferPriceSchema,
+            self.xml_service.set_city_prices_xml,
+        )
+        registry.register(
+            "set_store_availability",
+            settings.MQ_SET_STORE_AVAILABILITY_XML_QUEUE,
+            SetStoreAvailabilitySchema,
+            self.xml_service.set_store_availability_xml,
+        )
+        registry.register(
+            "add_stores_to_offer",
+            settings.MQ_ADD_STORES_TO_OFFER_XML_QUEUE,
+            AddStoresToOfferSchema,
+            self.xml_service.add_stores_to_offer_xml,
+        )
+        return registry
 
-    async def process_xml_message(
-        self,
-        body: bytes,
-        schema_class: "Any",
-        xml_operation: Callable[["Element", "Any"], "Element"],
+    def queue_process_map(self) -> "Dict[str, Callable]":
+        return {
+            operation.queue_name: functools.partial(self.process_operation, operation)
+            for operation in self.registry
+        }
+
+    def catalog_destination(self, merchant_id: str) -> str:
+        return f"{self.file_path}/{merchant_id}/products.xml"
+
+    def _track_activity(self, merchant_id: str) -> None:
+        if self.activity_tracker is not None:
+            self.activity_tracker.touch(merchant_id)
+
+    def _measure(self, stage: str):
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.measure(stage)
+
+    async def dispatch(self, body: bytes, message_type: Optional[str]) -> None:
+        if not message_type:
+            raise InvalidMessageError("Message type header is missing")
+
+        await self.process_operation(self.registry.get(message_type), body)
+
+    async def process_operation(
+        self, operation: "MessageOperation", body: bytes
     ) -> None:
-        logging.info(f"Processing START {xml_operation}")
-        
+        if operation.requires_catalog:
+            await self.process_xml_message(operation, body)
+        else:
+            await self.process_new_xml_message(operation, body)
 
-        payload = body.decode()
-        logging.info(f"Processing START PAYLOAD {payload}")
+    async def process_xml_message(
+        self, operation: "MessageOperation", body: bytes
+    ) -> None:
+        logging.info(f"Processing START {operation.message_type}")
+        logging.debug("Processing START PAYLOAD %s", body)
         logging.info(f"Step 1 | Processing import")
 
-        data = schema_class.model_validate_json(payload)
+        with self._measure("validate"):
+            data = operation.validate(body)
         logging.info(f"Step 2 | Pydantic model converted from payload:")
 
-        destination = f"{self.file_path}/{data.merchant_id}/products.xml"
-        xml_string_content = self.gcp_service.download_xml(destination)
+        self._track_activity(data.merchant_id)
+        destination = self.catalog_destination(data.merchant_id)
+        with self._measure("download"):
+            xml_string_content = self.gcp_service.download_xml(destination)
         logging.info(f"Step 3 | Content of String XML")
 
-        root = XMLService.string_to_xml(xml_string_content)
+        with self._measure("parse"):
+            root = XMLService.string_to_xml(xml_string_content)
 
-        updated_root = xml_operation(root, data)
-        updated_xml_string_content = XMLService.xml_to_string(updated_root)
+        with self._measure("operation"):
+            updated_root = operation.xml_operation(root, data)
+        with self._measure("serialize"):
+            updated_xml_string_content = XMLService.xml_to_string(updated_root)
         logging.info(f"Step 4 | Updated XML content")
 
-        url = self.gcp_service.upload_xml(updated_xml_string_content, destination)
+        with self._measure("upload"):
+            url = self.gcp_service.upload_xml(updated_xml_string_content, destination)
         logging.info(f"Step 5 | Updated XML uploaded to: {url}")
 
-    async def process_create_user_xml_message(self, body: bytes):
-        logging.info("In create user XML message processes")
-
-        payload = body.decode()
+    async def process_new_xml_message(
+        self, operation: "MessageOperation", body: bytes
+    ) -> None:
+        logging.info(f"Processing START {operation.message_type}")
         logging.info(f"Step 1 | Processing import")
 
-        data = CreateUserSchema.model_validate_json(payload)
+        with self._measure("validate"):
+            data = operation.validate(body)
         logging.info(f"Step 2 | Pydantic model converted from payload")
 
-        root = self.xml_service.create_user_xml(data)
+        with self._measure("operation"):
+            root = operation.xml_operation(data)
         logging.info(f"Step 3 | Root of created xml")
 
-        xml_content = XMLService.xml_to_string(root)
+        with self._measure("serialize"):
+            xml_content = XMLService.xml_to_string(root)
         logging.info(f"Step 4 | Content of XML")
 
-        destination = f"{self.file_path}/{data.merchant_id}/products.xml"
-        url = self.gcp_service.upload_xml(xml_content, destination)
+        self._track_activity(data.merchant_id)
+        destination = self.catalog_destination(data.merchant_id)
+        with self._measure("upload"):
+            url = self.gcp_service.upload_xml(xml_content, destination)
         logging.info(f"Step 5 | XML uploaded successfully. URL: {url}")
-
-    async def process_add_new_offers_to_xml_message(self, body: bytes):
-        await self.process_xml_message(
-            body,
-            AddNewOffersSchema,
-            self.xml_service.add_offers_to_xml,
-        )
-
-    async def process_delete_offers_from_xml_message(self, body: bytes):
-        await self.process_xml_message(
-            body,
-            DeleteOfferSchema,
-            self.xml_service.delete_offer_from_xml,
-        )
-
-    async def process_disable_pickup_point_xml_message(self, body: bytes):
-        await self.process_xml_message(
-            body,
-            DisablePickupSchema,
-            self.xml_service.disable_pickup_point_xml,
-        )
-
-    async def process_enable_pickup_point_xml_message(self, body: bytes):
-        await self.process_xml_message(
-            body, EnablePickupSchema, self.xml_service.enable_pickup_point_xml
-        )
-
-    async def process_set_city_prices_xml_message(self, body: bytes):
-        await self.process_xml_message(
-            body, SetOfferPriceSchema, self.xml_service.set_city_prices_xml
-        )
-
-    async def process_set_store_availability_xml_message(self, body: bytes):
-        await self.process_xml_message(
-            body,
-            SetStoreAvailabilitySchema,
-            self.xml_service.set_store_availability_xml,
-        )
-
-    async def process_add_stores_to_offer_xml_message(self, body: bytes):
-        await self.process_xml_message(
-            body, AddStoresToOfferSchema, self.xml_service.add_stores_to_offer_xml
-        )
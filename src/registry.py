@@ -0,0 +1,62 @@
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, Type
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class InvalidMessageError(ValueError):
+    pass
+
+
+class MessageOperation:
+    def __init__(
+        self,
+        message_type: str,
+        queue_name: str,
+        schema_class: Type[BaseModel],
+        xml_operation: Callable[..., "Any"],
+        requires_catalog: bool = True,
+    ):
+        self.message_type = message_type
+        self.queue_name = queue_name
+        self.schema_class = schema_class
+        self.xml_operation = xml_operation
+        self.requires_catalog = requires_catalog
+
+    def validate(self, body: bytes) -> BaseModel:
+        # pydantic builds the core validator once per model class; feeding it
+        # the raw bytes skips the decode and the intermediate str copy.
+        return self.schema_class.model_validate_json(body)
+
+
+class OperationRegistry:
+    def __init__(self):
+        self._operations: Dict[str, MessageOperation] = {}
+
+    def register(
+        self,
+        message_type: str,
+        queue_name: str,
+        schema_class: Type[BaseModel],
+        xml_operation: Callable[..., "Any"],
+        requires_catalog: bool = True,
+    ) -> MessageOperation:
+        if message_type in self._operations:
+            raise ValueError(f"Message type already registered: {message_type}")
+
+        operation = MessageOperation(
+            message_type, queue_name, schema_class, xml_operation, requires_catalog
+        )
+        self._operations[message_type] = operation
+        return operation
+
+    def get(self, message_type: str) -> MessageOperation:
+        try:
+            return self._operations[message_type]
+        except KeyError:
+            raise InvalidMessageError(f"Unknown message type: {message_type}")
+
+    def __iter__(self) -> Iterator[MessageOperation]:
+        return iter(self._operations.values())
@@ -0,0 +1,6 @@
+__all__ = ["MessageRecorder", "read_recording"]
+
+# Only the recorder is exported here: production consumers import it, and the
+# replayer/stand-ins would drag the processor and botocore stubs into boot.
+# Import those from src.replay.replayer and src.replay.stubs.
+from src.replay.recorder import MessageRecorder, read_recording
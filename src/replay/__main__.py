@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import json
+import logging
+
+from src.config import settings
+from src.replay.replayer import replay
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.replay",
+        description="Replay a recorded message stream against in-process broker and storage stand-ins.",
+    )
+    parser.add_argument("recording", help="Path to a recording made with MQ_RECORD_FILE_PATH")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Multiplier over recorded timing; 0 replays as fast as possible",
+    )
+    parser.add_argument(
+        "--seed-dir",
+        help="Directory of <merchant_id>/products.xml catalogs to preload into storage",
+    )
+    parser.add_argument(
+        "--create-missing-catalogs",
+        action="store_true",
+        help="Serve an empty catalog for merchants missing from storage",
+    )
+    parser.add_argument(
+        "--storage-latency",
+        type=float,
+        default=0.0,
+        help="Seconds of simulated latency per storage operation",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        help="Override MQ_MESSAGE_MAX_RETRIES_COUNT for the replay",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    settings.configure_logging(level=logging.WARNING)
+
+    report = asyncio.run(
+        replay(
+            args.recording,
+            speed=args.speed,
+            seed_directory=args.seed_dir,
+            create_missing_catalogs=args.create_missing_catalogs,
+            storage_latency=args.storage_latency,
+            max_retries=args.max_retries,
+        )
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
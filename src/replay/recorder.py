@@ -0,0 +1,112 @@
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import time
+from typing import Iterator, Optional
+
+from pydantic import BaseModel
+
+
+RECORDING_FORMAT_VERSION = 2
+REDACTED_FIELDS = ("store_name",)
+
+
+class RecordingHeaderSchema(BaseModel):
+    version: int
+    recorded_at: float
+    redacted: bool
+
+
+class RecordedMessageSchema(BaseModel):
+    offset: float
+    queue_name: str
+    body: str
+    message_type: Optional[str] = None
+    idempotency_key: Optional[str] = None
+
+    @property
+    def body_bytes(self) -> bytes:
+        return base64.b64decode(self.body)
+
+
+class MessageRecorder:
+    FLUSH_EVERY = 100
+
+    def __init__(self, file_path: str, redact_merchant_names: bool = True):
+        self.file_path = file_path
+        self.redact_merchant_names = redact_merchant_names
+        self.started_at = time.monotonic()
+        self.records_count = 0
+        self._file = gzip.open(file_path, "wt", encoding="utf-8")
+
+        header = RecordingHeaderSchema(
+            version=RECORDING_FORMAT_VERSION,
+            recorded_at=time.time(),
+            redacted=redact_merchant_names,
+        )
+        self._file.write(header.model_dump_json() + "\n")
+
+    def record(
+        self,
+        queue_name: str,
+        body: bytes,
+        message_type: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> None:
+        if self.redact_merchant_names:
+            body = self._redact(body)
+
+        record = RecordedMessageSchema(
+            offset=time.monotonic() - self.started_at,
+            queue_name=queue_name,
+            body=base64.b64encode(body).decode("ascii"),
+            message_type=message_type,
+            idempotency_key=idempotency_key,
+        )
+        self._file.write(record.model_dump_json() + "\n")
+
+        self.records_count += 1
+        if self.records_count % self.FLUSH_EVERY == 0:
+            self._file.flush()
+
+    @staticmethod
+    def _redact(body: bytes) -> bytes:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return body
+
+        if not isinstance(data, dict) or not any(f in data for f in REDACTED_FIELDS):
+            return body
+
+        for field in REDACTED_FIELDS:
+            if isinstance(data.get(field), str):
+                digest = hashlib.sha256(data[field].encode()).hexdigest()[:12]
+                data[field] = f"merchant-{digest}"
+
+        return json.dumps(data, separators=(",", ":")).encode()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+
+        self._file.close()
+        logging.info(f"Recorded {self.records_count} messages to: {self.file_path}")
+
+
+def read_recording(file_path: str) -> Iterator[RecordedMessageSchema]:
+    with gzip.open(file_path, "rt", encoding="utf-8") as file:
+        header = RecordingHeaderSchema.model_validate_json(file.readline())
+        if header.version != RECORDING_FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version: {header.version}")
+
+        try:
+            for line in file:
+                if line.strip():
+                    yield RecordedMessageSchema.model_validate_json(line)
+        except EOFError:
+            # A recorder stopped without close() leaves no end-of-stream marker;
+            # everything flushed before that point is still readable.
+            logging.warning(f"Recording ends without end-of-stream marker: {file_path}")
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from src.config import settings
+from src.deduplication import build_deduplicator
+from src.consumer import (
+    RabbitMQConsumer,
+    MultiplexedConsumer,
+    MESSAGE_TYPE_HEADER,
+    IDEMPOTENCY_KEY_HEADER,
+)
+from src.metrics import StageMetrics
+from src.processes import XMLMessageProcessor
+from src.schemas import CreateUserSchema
+from src.services import XMLService
+from src.replay.recorder import read_recording
+from src.replay.stubs import InMemoryBroker, InMemoryMessage, InMemoryStorageClient
+
+if TYPE_CHECKING:
+    from typing import List
+
+
+class MessageReplayer:
+    def __init__(
+        self,
+        recording_path: str,
+        speed: float = 1.0,
+        storage_client: Optional[InMemoryStorageClient] = None,
+        max_retries: Optional[int] = None,
+    ):
+        self.recording_path = recording_path
+        self.speed = speed
+        self.storage_client = storage_client or InMemoryStorageClient()
+        self.max_retries = max_retries
+        self.metrics = StageMetrics()
+        self.deduplicator = build_deduplicator(persist=False)
+        self.processor = XMLMessageProcessor(metrics=self.metrics)
+        self.processor.gcp_service.client = self.storage_client
+        self.queue_counts: Dict[str, int] = defaultdict(int)
+        self.outcomes: Dict[str, int] = defaultdict(int)
+        self.retries = 0
+        # Backoff follows the replay clock so retries don't dominate fast replays.
+        self.retry_backoff_scale = 1 / speed if speed > 0 else 0.0
+        self.broker = InMemoryBroker(
+            on_processed=self._on_processed, delay_scale=self.retry_backoff_scale
+        )
+
+    @staticmethod
+    def empty_catalog_factory(key: str) -> bytes:
+        merchant_id = key.rsplit("/", 2)[-2]
+        data = CreateUserSchema(merchant_id=merchant_id, store_name=merchant_id)
+        return XMLService.xml_to_string(XMLService().create_user_xml(data))
+
+    def _on_processed(self, queue_name: str, message: InMemoryMessage) -> None:
+        finished_at = time.perf_counter()
+        self.metrics.observe("queue_wait", message.delivered_at - message.published_at)
+        self.metrics.observe("handle", finished_at - message.delivered_at)
+        self.metrics.observe("end_to_end", finished_at - message.published_at)
+        self.outcomes[message.outcome or "unsettled"] += 1
+        if "x-retry-count" in message.headers:
+            self.retries += 1
+
+    async def _start_consumers(self) -> "List[RabbitMQConsumer]":
+        consumer_specs = [
+            (RabbitMQConsumer, queue_name, process_func)
+            for queue_name, process_func in self.processor.queue_process_map().items()
+        ] + [
+            (MultiplexedConsumer, queue_name, self.processor.dispatch)
+            for queue_name in settings.ingress_queues
+        ]
+
+        consumers = []
+        for consumer_class, queue_name, process_func in consumer_specs:
+            consumer = consumer_class(
+                queue_name,
+                process_func,
+                connection_factory=self.broker.connect,
+                deduplicator=self.deduplicator,
+            )
+            if self.max_retries is not None:
+                consumer.max_retries = self.max_retries
+            consumer.retry_backoff_scale = self.retry_backoff_scale
+
+            await consumer.connect()
+            await consumer.start_consuming()
+            consumers.append(consumer)
+        return consumers
+
+    async def run(self) -> Dict[str, Any]:
+        consumers = await self._start_consumers()
+        known_queues = {consumer.queue_name for consumer in consumers}
+
+        started_at = time.perf_counter()
+        first_offset = None
+        for record in read_recording(self.recording_path):
+            if record.queue_name not in known_queues:
+                self.outcomes["unknown_queue"] += 1
+                continue
+
+            if first_offset is None:
+                first_offset = record.offset
+
+            if self.speed > 0:
+                offset = record.offset - first_offset
+                delay = offset / self.speed - (time.perf_counter() - started_at)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            self.queue_counts[record.queue_name] += 1
+            headers = {}
+            if record.message_type:
+                headers[MESSAGE_TYPE_HEADER] = record.message_type
+            if record.idempotency_key:
+                headers[IDEMPOTENCY_KEY_HEADER] = record.idempotency_key
+            self.broker.publish(
+                record.queue_name, InMemoryMessage(record.body_bytes, headers=headers)
+            )
+
+        await self.broker.join()
+        elapsed = time.perf_counter() - started_at
+
+        for consumer in consumers:
+            await consumer.connection.close()
+
+        return self._report(elapsed)
+
+    def _report(self, elapsed: float) -> Dict[str, Any]:
+        messages = sum(self.queue_counts.values())
+        report = {
+            "messages": messages,
+            "deliveries": self.broker.published_count,
+            "elapsed_seconds": elapsed,
+            "throughput_per_second": messages / elapsed if elapsed else 0.0,
+            "queues": dict(self.queue_counts),
+            "outcomes": dict(self.outcomes),
+            "retries": self.retries,
+            "retry_backoff_scale": self.retry_backoff_scale,
+            "duplicates": self.deduplicator.duplicates_count if self.deduplicator else 0,
+            "stages": self.metrics.summary(),
+            "catalog_cache": (
+                self.processor.gcp_service.cache.stats()
+                if self.processor.gcp_service.cache
+                else {}
+            ),
+            "storage": {
+                "operations": dict(self.storage_client.operations),
+                "bytes_read": self.storage_client.bytes_read,
+                "bytes_written": self.storage_client.bytes_written,
+            },
+        }
+        logging.info(f"Replay finished: {messages} messages in {elapsed:.3f}s")
+        return report
+
+
+async def replay(
+    recording_path: str,
+    speed: float = 1.0,
+    seed_directory: Optional[str] = None,
+    create_missing_catalogs: bool = False,
+    storage_latency: float = 0.0,
+    max_retries: Optional[int] = None,
+) -> Dict[str, Any]:
+    storage_client = InMemoryStorageClient(
+        latency=storage_latency,
+        missing_object_factory=(
+            MessageReplayer.empty_catalog_factory if create_missing_catalogs else None
+        ),
+    )
+    if seed_directory:
+        seeded = storage_client.seed_from_directory(
+            seed_directory, settings.GCP_STORAGE_XML_FILE_PATH
+        )
+        logging.info(f"Seeded {seeded} catalogs from: {seed_directory}")
+
+    replayer = MessageReplayer(
+        recording_path,
+        speed=speed,
+        storage_client=storage_client,
+        max_retries=max_retries,
+    )
+    return await replayer.run()
@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import io
+import os
+import time
+import uuid
+from collections import defaultdict
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Union
+
+from botocore.exceptions import ClientError
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class InMemoryMessage:
+    def __init__(
+        self,
+        body: bytes,
+        headers: Optional[Dict[str, "Any"]] = None,
+        message_id: Optional[str] = None,
+    ):
+        self.body = body
+        self.headers = dict(headers or {})
+        self.message_id = message_id or uuid.uuid4().hex
+        self.published_at = time.perf_counter()
+        self.delivered_at: Optional[float] = None
+        self.outcome: Optional[str] = None
+
+    async def ack(self) -> None:
+        self.outcome = "acked"
+
+    async def reject(self, requeue: bool = False) -> None:
+        self.outcome = "rejected"
+
+
+class InMemoryQueue:
+    def __init__(
+        self,
+        name: str,
+        broker: "InMemoryBroker",
+        arguments: Optional[Dict[str, "Any"]] = None,
+    ):
+        self.name = name
+        self.broker = broker
+        self.arguments = arguments or {}
+        self._messages: "asyncio.Queue[InMemoryMessage]" = asyncio.Queue()
+        self._consumer_tasks = []
+        self._callbacks = []
+
+    def put(self, message: InMemoryMessage) -> None:
+        if "x-message-ttl" in self.arguments:
+            self.broker.dead_letter_later(
+                self.arguments["x-message-ttl"] / 1000,
+                self.arguments.get("x-dead-letter-routing-key", self.name),
+                message,
+            )
+            return
+
+        self._messages.put_nowait(message)
+
+    async def consume(self, callback: Callable) -> str:
+        self._callbacks.append(callback)
+        consumer_tag = f"ctag-{self.name}-{len(self._callbacks)}"
+
+        # A single-active-consumer queue keeps later subscribers on standby.
+        if self.arguments.get("x-single-active-consumer") and self._consumer_tasks:
+            return consumer_tag
+
+        task = asyncio.create_task(self._consume_loop(callback))
+        self._consumer_tasks.append(task)
+        return consumer_tag
+
+    async def _consume_loop(self, callback: Callable) -> None:
+        while True:
+            message = await self._messages.get()
+            message.delivered_at = time.perf_counter()
+            try:
+                await callback(message)
+            finally:
+                self._messages.task_done()
+                self.broker.on_processed(self.name, message)
+
+    async def join(self) -> None:
+        await self._messages.join()
+
+    def cancel(self) -> None:
+        for task in self._consumer_tasks:
+            task.cancel()
+        self._consumer_tasks.clear()
+
+
+class InMemoryExchange:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.broker = broker
+
+    async def publish(self, message: "Any", routing_key: str) -> None:
+        self.broker.publish(
+            routing_key,
+            InMemoryMessage(
+                message.body, headers=message.headers, message_id=message.message_id
+            ),
+        )
+
+
+class InMemoryChannel:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.broker = broker
+        self.default_exchange = InMemoryExchange(broker)
+
+    async def set_qos(self, prefetch_count: int = 0) -> None:
+        pass
+
+    async def declare_queue(
+        self,
+        name: str,
+        durable: bool = True,
+        arguments: Optional[Dict[str, "Any"]] = None,
+    ) -> InMemoryQueue:
+        return self.broker.get_queue(name, arguments)
+
+
+class InMemoryBroker:
+    def __init__(
+        self, on_processed: Optional[Callable] = None, delay_scale: float = 1.0
+    ):
+        self.queues: Dict[str, InMemoryQueue] = {}
+        self.published_count = 0
+        self.delay_scale = delay_scale
+        self._on_processed = on_processed
+        self._delayed_tasks = set()
+
+    async def connect(self, url: str) -> "InMemoryBroker":
+        return self
+
+    async def channel(self) -> InMemoryChannel:
+        return InMemoryChannel(self)
+
+    async def close(self) -> None:
+        for queue in self.queues.values():
+            queue.cancel()
+        for task in self._delayed_tasks:
+            task.cancel()
+
+    def get_queue(
+        self, name: str, arguments: Optional[Dict[str, "Any"]] = None
+    ) -> InMemoryQueue:
+        if name not in self.queues:
+            self.queues[name] = InMemoryQueue(name, self, arguments)
+        return self.queues[name]
+
+    def dead_letter_later(
+        self, ttl: float, routing_key: str, message: InMemoryMessage
+    ) -> None:
+        async def expire() -> None:
+            await asyncio.sleep(ttl * self.delay_scale)
+            message.published_at = time.perf_counter()
+            self.get_queue(routing_key).put(message)
+
+        task = asyncio.create_task(expire())
+        self._delayed_tasks.add(task)
+        task.add_done_callback(self._delayed_tasks.discard)
+
+    def publish(self, queue_name: str, message: InMemoryMessage) -> None:
+        self.published_count += 1
+        self.get_queue(queue_name).put(message)
+
+    def on_processed(self, queue_name: str, message: InMemoryMessage) -> None:
+        if self._on_processed is not None:
+            self._on_processed(queue_name, message)
+
+    async def join(self) -> None:
+        while True:
+            await asyncio.gather(*(queue.join() for queue in self.queues.values()))
+            if not self._delayed_tasks:
+                return
+            await asyncio.gather(*self._delayed_tasks)
+
+
+class InMemoryStorageClient:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        missing_object_factory: Optional[Callable[[str], bytes]] = None,
+    ):
+        self.objects: Dict[str, bytes] = {}
+        self.operations: Dict[str, int] = defaultdict(int)
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.latency = latency
+        self.missing_object_factory = missing_object_factory
+
+    def seed(self, key: str, body: Union[str, bytes]) -> None:
+        self.objects[key] = body.encode() if isinstance(body, str) else body
+
+    def seed_from_directory(self, directory: str, prefix: str) -> int:
+        seeded = 0
+        for merchant_id in sorted(os.listdir(directory)):
+            file_path = os.path.join(directory, merchant_id, "products.xml")
+            if os.path.isfile(file_path):
+                with open(file_path, "rb") as file:
+                    self.seed(f"{prefix}/{merchant_id}/products.xml", file.read())
+                seeded += 1
+        return seeded
+
+    def put_object(self, Bucket: str, Key: str, Body: Union[str, bytes], **kwargs):
+        self._simulate_latency()
+        self.operations["put_object"] += 1
+
+        body = Body.encode() if isinstance(Body, str) else Body
+        self.bytes_written += len(body)
+        self.objects[Key] = body
+        return {"ETag": self._etag(body)}
+
+    def get_object(
+        self, Bucket: str, Key: str, IfNoneMatch: Optional[str] = None, **kwargs
+    ):
+        self._simulate_latency()
+        self.operations["get_object"] += 1
+
+        if Key not in self.objects and self.missing_object_factory is not None:
+            self.operations["get_object_created_missing"] += 1
+            self.objects[Key] = self.missing_object_factory(Key)
+
+        if Key not in self.objects:
+            raise ClientError(
+                {"Error": {"Code": "NoSuchKey", "Message": f"{Key} not found"}},
+                "GetObject",
+            )
+
+        body = self.objects[Key]
+        etag = self._etag(body)
+        if IfNoneMatch == etag:
+            self.operations["get_object_not_modified"] += 1
+            raise ClientError(
+                {"Error": {"Code": "304", "Message": "Not Modified"}}, "GetObject"
+            )
+
+        self.bytes_read += len(body)
+        return {"Body": io.BytesIO(body), "ETag": etag}
+
+    @staticmethod
+    def _etag(body: bytes) -> str:
+        return f'"{hashlib.md5(body).hexdigest()}"'
+
+    def _simulate_latency(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
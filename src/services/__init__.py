@@ -1,4 +1,5 @@
-__all__ = ["XMLService", "GCPUploadService"]
+__all__ = ["XMLService", "GCPUploadService", "CatalogCache"]
 
 from src.services.xml_services import XMLService
+from src.services.catalog_cache import CatalogCache
 from src.services.gcp_file_upload_services import GCPUploadService
@@ -0,0 +1,110 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class CachedCatalog:
+    def __init__(self, etag: str, content: str):
+        self.etag = etag
+        self.content = content
+        # In-memory footprint, not character count: Cyrillic text is stored
+        # with two bytes per character.
+        self.size = sys.getsizeof(content)
+
+
+class CatalogCache:
+    def __init__(self, max_bytes: int, warm_budget_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.warm_budget_bytes = min(warm_budget_bytes or max_bytes, max_bytes)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.warmed_keys = set()
+        self.warmed_count = 0
+        self.warm_hits = 0
+        self.accepting_warm = True
+        self._catalogs: "OrderedDict[str, CachedCatalog]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedCatalog]:
+        with self._lock:
+            catalog = self._catalogs.get(key)
+            if catalog is not None:
+                self._catalogs.move_to_end(key)
+            return catalog
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._catalogs
+
+    def put(
+        self, key: str, etag: Optional[str], content: str, warm: bool = False
+    ) -> bool:
+        catalog = CachedCatalog(etag, content)
+        if not etag or catalog.size > self.max_bytes:
+            self.discard(key)
+            return False
+
+        with self._lock:
+            if warm and (
+                not self.accepting_warm
+                or key not in self._catalogs
+                and self.total_bytes + catalog.size > self.warm_budget_bytes
+            ):
+                return False
+
+            self._remove(key)
+            self._catalogs[key] = catalog
+            self.total_bytes += catalog.size
+            if warm:
+                self.warmed_keys.add(key)
+                self.warmed_count += 1
+
+            while self.total_bytes > self.max_bytes:
+                evicted_key = next(iter(self._catalogs))
+                self._remove(evicted_key)
+        return True
+
+    def record_lookup(self, key: str, hit: bool) -> None:
+        with self._lock:
+            if not hit:
+                self.misses += 1
+                self.warmed_keys.discard(key)
+                return
+
+            self.hits += 1
+            if key in self.warmed_keys:
+                self.warm_hits += 1
+                self.warmed_keys.discard(key)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def stop_warming(self) -> None:
+        with self._lock:
+            self.accepting_warm = False
+
+    def discard_warm(self, key: str) -> None:
+        with self._lock:
+            if key in self.warmed_keys:
+                self._remove(key)
+                self.warmed_count -= 1
+
+    def _remove(self, key: str) -> None:
+        catalog = self._catalogs.pop(key, None)
+        if catalog is not None:
+            self.total_bytes -= catalog.size
+            self.warmed_keys.discard(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "catalogs": len(self._catalogs),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "warmed": self.warmed_count,
+                "warm_hits": self.warm_hits,
+            }
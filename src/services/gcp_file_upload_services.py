@@ -2,6 +2,9 @@ import logging
 from botocore.exceptions import ClientError
 
 from src.config import settings
+from src.services.catalog_cache import CatalogCache
+
+NOT_MODIFIED_ERROR_CODES = ("304", "NotModified")
 
 
 class GCPUploadService:
@@ -9,10 +12,18 @@ class GCPUploadService:
         self.bucket_name = settings.GCP_BUCKET_NAME
         self.gcp_endpoint_url = settings.GCP_ENDPOINT_URL
         self.client = settings.get_boto3_client
+        self.cache = (
+            CatalogCache(
+                settings.catalog_cache_max_bytes,
+                warm_budget_bytes=settings.WARMUP_MEMORY_BUDGET_BYTES,
+            )
+            if settings.catalog_cache_max_bytes
+            else None
+        )
 
     def upload_xml(self, xml_content: str, destination: str) -> str:
         try:
-            self.client.put_object(
+            response = self.client.put_object(
                 Bucket=self.bucket_name,
                 Key=destination,
                 Body=xml_content,
@@ -20,19 +31,41 @@ class GCPUploadService:
                 CacheControl="no-store, must-revalidate, max-age=0",
             )
 
+            if self.cache is not None:
+                if isinstance(xml_content, bytes):
+                    xml_content = xml_content.decode("utf-8")
+                self.cache.put(destination, response.get("ETag"), xml_content)
+
             return f"{self.gcp_endpoint_url}/{self.bucket_name}/{destination}"
         except Exception as exception:
             logging.error(f"Failed to upload XML content: {str(exception)}")
             raise exception
 
-    def download_xml(self, file_name: str) -> str:
+    def download_xml(self, file_name: str, warm: bool = False) -> str:
+        cached = self.cache.get(file_name) if self.cache is not None else None
+        conditions = {"IfNoneMatch": cached.etag} if cached is not None else {}
+
         try:
-            response = self.client.get_object(Bucket=self.bucket_name, Key=file_name)
+            response = self.client.get_object(
+                Bucket=self.bucket_name, Key=file_name, **conditions
+            )
 
             xml_content = response["Body"].read().decode("utf-8")
+            if self.cache is not None:
+                if not warm:
+                    self.cache.record_lookup(file_name, hit=False)
+                self.cache.put(file_name, response.get("ETag"), xml_content, warm=warm)
             return xml_content
         except ClientError as boto_exception:
-            if boto_exception.response["Error"]["Code"] == "NoSuchKey":
+            error_code = boto_exception.response["Error"]["Code"]
+            if cached is not None and error_code in NOT_MODIFIED_ERROR_CODES:
+                if not warm:
+                    self.cache.record_lookup(file_name, hit=True)
+                return cached.content
+
+            if error_code == "NoSuchKey":
+                if self.cache is not None:
+                    self.cache.discard(file_name)
 
                 logging.error(f"File not found: gs://{self.bucket_name}/{file_name}")
                 raise FileNotFoundError(
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from src.config import settings
+
+if TYPE_CHECKING:
+    from src.processes import XMLMessageProcessor
+    from src.services import CatalogCache
+
+
+class MerchantActivityTracker:
+    def __init__(
+        self,
+        state_path: str,
+        half_life_seconds: float = 3600,
+        max_entries: int = 1000,
+        save_every: int = 100,
+    ):
+        self.state_path = state_path
+        self.half_life_seconds = half_life_seconds
+        self.max_entries = max_entries
+        self.save_every = save_every
+        self._scores: Dict[str, List[float]] = {}
+        self._unsaved = 0
+        self._load()
+
+    def _decayed(self, merchant_id: str, now: float) -> float:
+        score, updated_at = self._scores.get(merchant_id, (0.0, now))
+        return score * 0.5 ** ((now - updated_at) / self.half_life_seconds)
+
+    def touch(self, merchant_id: str) -> None:
+        now = time.time()
+        self._scores[merchant_id] = [self._decayed(merchant_id, now) + 1, now]
+
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def top(self, count: int) -> List[str]:
+        now = time.time()
+        ranked = sorted(
+            self._scores,
+            key=lambda merchant_id: self._decayed(merchant_id, now),
+            reverse=True,
+        )
+        return ranked[:count]
+
+    def _load(self) -> None:
+        if not os.path.exists(self.state_path):
+            return
+
+        try:
+            with open(self.state_path, encoding="utf-8") as file:
+                state = json.load(file)
+        except (OSError, ValueError) as exception:
+            logging.warning(f"Ignoring unreadable activity state: {str(exception)}")
+            return
+
+        if not isinstance(state, dict):
+            logging.warning(f"Ignoring malformed activity state: {self.state_path}")
+            return
+
+        self._scores = {
+            merchant_id: [float(entry[0]), float(entry[1])]
+            for merchant_id, entry in state.items()
+            if isinstance(entry, list)
+            and len(entry) == 2
+            and all(
+                isinstance(value, (int, float)) and not isinstance(value, bool)
+                for value in entry
+            )
+        }
+
+    def save(self) -> None:
+        self._scores = {
+            merchant_id: self._scores[merchant_id]
+            for merchant_id in self.top(self.max_entries)
+        }
+
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self._scores, file, separators=(",", ":"))
+        os.replace(temp_path, self.state_path)
+        self._unsaved = 0
+
+
+async def warm_up_catalogs(
+    processor: "XMLMessageProcessor", merchant_ids: List[str]
+) -> Dict[str, int]:
+    cache = processor.gcp_service.cache
+    semaphore = asyncio.Semaphore(settings.WARMUP_CONCURRENCY)
+    stats = {
+        "attempted": len(merchant_ids),
+        "warmed": 0,
+        "failed": 0,
+        "skipped": 0,
+        "timed_out": 0,
+    }
+
+    deadline = time.monotonic() + settings.WARMUP_DEADLINE_SECONDS
+
+    async def warm(destination: str) -> None:
+        async with semaphore:
+            if time.monotonic() >= deadline:
+                stats["timed_out"] += 1
+                return
+
+            if cache.total_bytes >= cache.warm_budget_bytes:
+                stats["skipped"] += 1
+                return
+
+            try:
+                await asyncio.to_thread(
+                    processor.gcp_service.download_xml, destination, True
+                )
+                # The cache enforces the budget under its lock; a catalog that
+                # would overshoot it is downloaded but not kept.
+                if destination in cache:
+                    stats["warmed"] += 1
+                else:
+                    stats["skipped"] += 1
+            except Exception as exception:
+                cache.discard(destination)
+                stats["failed"] += 1
+                logging.warning(f"Warm-up failed for {destination}: {str(exception)}")
+
+    destinations = [
+        processor.catalog_destination(merchant_id) for merchant_id in merchant_ids
+    ]
+    tasks = {
+        asyncio.create_task(warm(destination)): destination
+        for destination in destinations
+    }
+    if not tasks:
+        return stats
+
+    _, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - time.monotonic()))
+    # Cancelling a task does not stop its to_thread download, so the cache
+    # refuses warm puts from here on, and a catalog that landed before its
+    # task could count it is dropped to keep "warmed" in step with the cache.
+    cache.stop_warming()
+    for task in pending:
+        task.cancel()
+        cache.discard_warm(tasks[task])
+    stats["timed_out"] += len(pending)
+    return stats
+
+
+async def warm_up(
+    processor: "XMLMessageProcessor", tracker: Optional[MerchantActivityTracker]
+) -> Dict[str, int]:
+    if tracker is None or processor.gcp_service.cache is None:
+        return {}
+
+    merchant_ids = tracker.top(settings.WARMUP_MERCHANTS_COUNT)
+    return await warm_up_catalogs(processor, merchant_ids)
+
+
+async def report_warm_up_hit_rate(cache: "CatalogCache", delay: float) -> None:
+    await asyncio.sleep(delay)
+
+    stats = cache.stats()
+    hit_rate = stats["warm_hits"] / stats["warmed"] if stats["warmed"] else 0.0
+    logging.info(
+        f"Warm-up hit rate after {delay:.0f}s: {hit_rate:.1%} "
+        f"({stats['warm_hits']}/{stats['warmed']} warmed catalogs reused)"
+    )
@@ -0,0 +1,27 @@
+import os
+
+TEST_SETTINGS = {
+    "RMQ_HOST": "localhost",
+    "RMQ_PORT": "5672",
+    "RMQ_USER": "guest",
+    "RMQ_PASSWORD": "guest",
+    "MQ_EXCHANGE": "xml",
+    "MQ_MESSAGE_MAX_RETRIES_COUNT": "2",
+    "MQ_CREATE_USER_XML_QUEUE": "create_user_xml",
+    "MQ_ADD_NEW_OFFER_TO_XML_QUEUE": "add_new_offer_to_xml",
+    "MQ_DELETE_OFFER_XML_QUEUE": "delete_offer_xml",
+    "MQ_DISABLE_PICKUP_POINT_XML_QUEUE": "disable_pickup_point_xml",
+    "MQ_ENABLE_PICKUP_POINT_XML_QUEUE": "enable_pickup_point_xml",
+    "MQ_SET_CITY_PRICES_XML_QUEUE": "set_city_prices_xml",
+    "MQ_SET_STORE_AVAILABILITY_XML_QUEUE": "set_store_availability_xml",
+    "MQ_ADD_STORES_TO_OFFER_XML_QUEUE": "add_stores_to_offer_xml",
+    "GCP_BUCKET_NAME": "bucket",
+    "GCP_BUCKET_REGION": "us-east-1",
+    "GCP_ACCESS_KEY_ID": "key",
+    "GCP_SECRET_ACCESS_KEY": "secret",
+    "GCP_ENDPOINT_URL": "http://localhost:4443",
+    "GCP_STORAGE_XML_FILE_PATH": "xml",
+}
+
+for name, value in TEST_SETTINGS.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,114 @@
+import sys
+
+from src.services import CatalogCache, GCPUploadService
+from src.replay.stubs import InMemoryStorageClient
+
+
+def catalog(characters: int, char: str = "a") -> str:
+    return char * characters
+
+
+def test_least_recently_used_catalog_is_evicted():
+    size = sys.getsizeof(catalog(100))
+    cache = CatalogCache(max_bytes=2 * size)
+
+    cache.put("a", "e-a", catalog(100))
+    cache.put("b", "e-b", catalog(100))
+    cache.get("a")
+    cache.put("c", "e-c", catalog(100))
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.total_bytes == 2 * size
+
+
+def test_size_counts_memory_not_characters():
+    cache = CatalogCache(max_bytes=1024 * 1024)
+
+    cache.put("ascii", "e-1", catalog(1000))
+    ascii_bytes = cache.total_bytes
+    cache.put("cyrillic", "e-2", catalog(1000, "ж"))
+
+    assert cache.total_bytes - ascii_bytes >= 2000
+
+
+def test_warm_put_respects_warm_budget():
+    size = sys.getsizeof(catalog(100))
+    cache = CatalogCache(max_bytes=10 * size, warm_budget_bytes=size)
+
+    assert cache.put("a", "e-a", catalog(100), warm=True)
+    assert not cache.put("b", "e-b", catalog(100), warm=True)
+    assert cache.put("b", "e-b", catalog(100))
+    assert cache.stats()["warmed"] == 1
+
+
+def test_warm_puts_are_refused_once_warming_stops():
+    cache = CatalogCache(max_bytes=1024 * 1024)
+    cache.put("a", "e-a", catalog(100), warm=True)
+
+    cache.stop_warming()
+    cache.discard_warm("a")
+
+    assert not cache.put("b", "e-b", catalog(100), warm=True)
+    assert cache.put("b", "e-b", catalog(100))
+    assert "a" not in cache
+    assert cache.stats()["warmed"] == 0
+
+
+def test_catalog_without_etag_is_not_cached():
+    cache = CatalogCache(max_bytes=1024)
+
+    assert not cache.put("a", None, catalog(10))
+    assert "a" not in cache
+
+
+def make_service() -> GCPUploadService:
+    service = GCPUploadService()
+    service.client = InMemoryStorageClient()
+    service.cache = CatalogCache(max_bytes=1024 * 1024)
+    return service
+
+
+def test_unchanged_catalog_is_served_from_cache():
+    service = make_service()
+    service.client.seed("xml/m1/products.xml", "<catalog/>")
+
+    assert service.download_xml("xml/m1/products.xml") == "<catalog/>"
+    assert service.download_xml("xml/m1/products.xml") == "<catalog/>"
+
+    assert service.client.operations["get_object_not_modified"] == 1
+    assert service.client.bytes_read == len(b"<catalog/>")
+    assert service.cache.stats()["hits"] == 1
+
+
+def test_catalog_changed_elsewhere_is_downloaded_again():
+    service = make_service()
+    service.client.seed("xml/m1/products.xml", "<catalog/>")
+    service.download_xml("xml/m1/products.xml")
+
+    service.client.seed("xml/m1/products.xml", "<catalog>new</catalog>")
+
+    assert service.download_xml("xml/m1/products.xml") == "<catalog>new</catalog>"
+    assert service.cache.stats()["misses"] == 2
+
+
+def test_upload_refreshes_cached_catalog():
+    service = make_service()
+    service.upload_xml(b"<catalog>v2</catalog>", "xml/m1/products.xml")
+
+    assert service.download_xml("xml/m1/products.xml") == "<catalog>v2</catalog>"
+    assert service.client.operations["get_object_not_modified"] == 1
+
+
+def test_warmed_catalog_hit_is_counted_once():
+    service = make_service()
+    service.client.seed("xml/m1/products.xml", "<catalog/>")
+
+    service.download_xml("xml/m1/products.xml", warm=True)
+    service.download_xml("xml/m1/products.xml")
+    service.download_xml("xml/m1/products.xml")
+
+    stats = service.cache.stats()
+    assert stats["warmed"] == 1
+    assert stats["warm_hits"] == 1
+    assert stats["hits"] == 2
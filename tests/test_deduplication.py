@@ -0,0 +1,138 @@
+import asyncio
+import functools
+from types import SimpleNamespace
+
+from src.consumer import RabbitMQConsumer, IDEMPOTENCY_KEY_HEADER
+from src.deduplication import DeduplicationWindow
+from src.processes import XMLMessageProcessor
+from src.replay.stubs import InMemoryMessage, InMemoryStorageClient
+
+CATALOG = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<yml_catalog><shop><offers><offer id="s1"/></offers></shop></yml_catalog>'
+)
+
+
+def test_key_is_duplicate_only_after_add():
+    window = DeduplicationWindow(window_seconds=60, max_entries=10)
+
+    assert not window.is_duplicate("a")
+    window.add("a")
+
+    assert window.is_duplicate("a")
+    assert window.duplicates_count == 1
+
+
+def test_keys_expire_after_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.deduplication.time.time", lambda: now[0])
+    window = DeduplicationWindow(window_seconds=10, max_entries=10)
+
+    window.add("a")
+    now[0] += 10
+    assert window.is_duplicate("a")
+
+    now[0] += 0.001
+    assert not window.is_duplicate("a")
+
+
+def test_oldest_keys_are_dropped_beyond_max_entries():
+    window = DeduplicationWindow(window_seconds=60, max_entries=3)
+
+    for key in "abcd":
+        window.add(key)
+
+    assert not window.is_duplicate("a")
+    assert all(window.is_duplicate(key) for key in "bcd")
+
+
+def test_persisted_keys_are_reloaded_within_bounds(tmp_path):
+    persist_path = tmp_path / "state" / "dedup.log"
+    window = DeduplicationWindow(60, 3, persist_path=str(persist_path))
+    for key in "abcd":
+        window.add(key)
+    window.close()
+
+    reloaded = DeduplicationWindow(60, 3, persist_path=str(persist_path))
+
+    assert not reloaded.is_duplicate("a")
+    assert all(reloaded.is_duplicate(key) for key in "bcd")
+    reloaded.close()
+
+
+def test_persisted_log_is_compacted(tmp_path):
+    persist_path = tmp_path / "dedup.log"
+    window = DeduplicationWindow(60, 2, persist_path=str(persist_path))
+    for key in "abcdefgh":
+        window.add(key)
+    window.close()
+
+    assert len(persist_path.read_text().splitlines()) <= 2 * 2
+
+
+def test_empty_idempotency_header_falls_back_to_message_id():
+    message = SimpleNamespace(headers={IDEMPOTENCY_KEY_HEADER: b""}, message_id="m-1")
+
+    assert RabbitMQConsumer._idempotency_key(message) == "m-1"
+
+
+def test_idempotency_header_takes_precedence_over_message_id():
+    message = SimpleNamespace(headers={IDEMPOTENCY_KEY_HEADER: b"k-1"}, message_id="m-1")
+
+    assert RabbitMQConsumer._idempotency_key(message) == "k-1"
+
+
+def test_key_with_newline_survives_reload(tmp_path):
+    persist_path = tmp_path / "dedup.log"
+    window = DeduplicationWindow(60, 10, persist_path=str(persist_path))
+    window.add("order-1\n0.000 order-2")
+    window.close()
+
+    reloaded = DeduplicationWindow(60, 10, persist_path=str(persist_path))
+
+    assert reloaded.is_duplicate("order-1\n0.000 order-2")
+    assert not reloaded.is_duplicate("order-2")
+    reloaded.close()
+
+
+def test_malformed_log_lines_are_skipped(tmp_path):
+    persist_path = tmp_path / "dedup.log"
+    persist_path.write_text('[1e12, "a"]\nnot json\n[1e12]\n[1e12, 7]\n')
+
+    window = DeduplicationWindow(60, 10, persist_path=str(persist_path))
+
+    assert window.is_duplicate("a")
+    assert len(window._seen) == 1
+    window.close()
+
+
+def test_consumer_processes_repeated_key_once():
+    async def scenario():
+        processor = XMLMessageProcessor()
+        processor.gcp_service.client = InMemoryStorageClient()
+        processor.gcp_service.client.seed(
+            processor.catalog_destination("m1"), CATALOG
+        )
+        operation = processor.registry.get("delete_offer")
+        consumer = RabbitMQConsumer(
+            operation.queue_name,
+            functools.partial(processor.process_operation, operation),
+            deduplicator=DeduplicationWindow(60, 100),
+        )
+        messages = [
+            InMemoryMessage(
+                b'{"merchant_id":"m1","sku":"s1"}',
+                headers={IDEMPOTENCY_KEY_HEADER: "k-1"},
+                message_id=f"m-{index}",
+            )
+            for index in range(2)
+        ]
+        for message in messages:
+            await consumer.process_message(message)
+        return processor.gcp_service.client, consumer.deduplicator, messages
+
+    client, deduplicator, messages = asyncio.run(scenario())
+
+    assert client.operations["get_object"] == 1
+    assert [message.outcome for message in messages] == ["acked", "acked"]
+    assert deduplicator.duplicates_count == 1
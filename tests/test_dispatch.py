@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from src.consumer import MultiplexedConsumer, MESSAGE_TYPE_HEADER
+from src.processes import XMLMessageProcessor
+from src.registry import InvalidMessageError
+from src.replay.stubs import InMemoryBroker, InMemoryMessage, InMemoryStorageClient
+
+
+def make_processor() -> XMLMessageProcessor:
+    processor = XMLMessageProcessor()
+    processor.gcp_service.client = InMemoryStorageClient()
+    return processor
+
+
+def test_registry_rejects_unknown_message_type():
+    processor = make_processor()
+
+    with pytest.raises(InvalidMessageError):
+        processor.registry.get("drop_catalog")
+
+
+def test_registry_covers_every_per_type_queue():
+    processor = make_processor()
+
+    assert len(processor.queue_process_map()) == 8
+
+
+def test_dispatch_requires_message_type():
+    processor = make_processor()
+
+    with pytest.raises(InvalidMessageError):
+        asyncio.run(processor.dispatch(b'{"merchant_id":"m1","sku":"s1"}', None))
+
+
+async def connect_ingress_consumer(processor, broker) -> MultiplexedConsumer:
+    consumer = MultiplexedConsumer(
+        "ingress", processor.dispatch, connection_factory=broker.connect
+    )
+    consumer.retry_backoff_scale = 0
+    await consumer.connect()
+    return consumer
+
+
+def test_ingress_queue_uses_single_active_consumer():
+    async def scenario():
+        broker = InMemoryBroker()
+        await connect_ingress_consumer(make_processor(), broker)
+        return broker.queues["ingress"].arguments
+
+    assert asyncio.run(scenario()) == {"x-single-active-consumer": True}
+
+
+def test_schema_invalid_payload_is_rejected_without_retry():
+    async def scenario():
+        broker = InMemoryBroker()
+        consumer = await connect_ingress_consumer(make_processor(), broker)
+        message = InMemoryMessage(
+            b'{"merchant_id":"m1"}', headers={MESSAGE_TYPE_HEADER: "delete_offer"}
+        )
+        await consumer.process_message(message)
+        return message, broker
+
+    message, broker = asyncio.run(scenario())
+
+    assert message.outcome == "rejected"
+    assert broker.published_count == 0
+
+
+def test_unknown_message_type_is_rejected_without_retry():
+    async def scenario():
+        broker = InMemoryBroker()
+        consumer = await connect_ingress_consumer(make_processor(), broker)
+        message = InMemoryMessage(
+            b'{"merchant_id":"m1","sku":"s1"}',
+            headers={MESSAGE_TYPE_HEADER: "drop_catalog"},
+        )
+        await consumer.process_message(message)
+        return message, broker
+
+    message, broker = asyncio.run(scenario())
+
+    assert message.outcome == "rejected"
+    assert broker.published_count == 0
+
+
+def test_failed_message_is_delayed_in_retry_queue():
+    async def scenario():
+        broker = InMemoryBroker()
+        published = []
+        publish = broker.publish
+
+        def capture(queue_name, message):
+            published.append((queue_name, message))
+            publish(queue_name, message)
+
+        broker.publish = capture
+        consumer = await connect_ingress_consumer(make_processor(), broker)
+        message = InMemoryMessage(
+            b'{"merchant_id":"missing","sku":"s1"}',
+            headers={MESSAGE_TYPE_HEADER: "delete_offer"},
+            message_id="m-1",
+        )
+        await consumer.process_message(message)
+        await broker.close()
+        return message, published
+
+    message, published = asyncio.run(scenario())
+
+    assert message.outcome == "acked"
+    [(queue_name, retry)] = published
+    assert queue_name == "ingress.retry.1"
+    assert retry.headers == {MESSAGE_TYPE_HEADER: "delete_offer", "x-retry-count": 1}
+    assert retry.message_id == "m-1"
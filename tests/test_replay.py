@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+from src.consumer import RabbitMQConsumer
+from src.metrics import StageMetrics
+from src.replay.recorder import MessageRecorder, read_recording
+from src.replay.replayer import replay
+from src.replay.stubs import InMemoryMessage
+
+
+def test_percentile_is_nearest_rank():
+    assert StageMetrics.percentile(list(range(1, 10)), 50) == 5
+    assert StageMetrics.percentile(list(range(1, 6)), 50) == 3
+    assert StageMetrics.percentile(list(range(1, 101)), 99) == 99
+    assert StageMetrics.percentile([7], 90) == 7
+
+
+def test_recording_keeps_non_utf8_bodies(tmp_path):
+    recording_path = str(tmp_path / "recording.gz")
+    recorder = MessageRecorder(recording_path)
+    recorder.record("queue", b"\xff\xfe not utf-8")
+    recorder.close()
+
+    [record] = read_recording(recording_path)
+
+    assert record.body_bytes == b"\xff\xfe not utf-8"
+
+
+def test_recording_redacts_store_name(tmp_path):
+    recording_path = str(tmp_path / "recording.gz")
+    recorder = MessageRecorder(recording_path)
+    recorder.record("queue", b'{"merchant_id":"m1","store_name":"Shop"}')
+    recorder.close()
+
+    [record] = read_recording(recording_path)
+
+    data = json.loads(record.body_bytes)
+    assert data["merchant_id"] == "m1"
+    assert data["store_name"].startswith("merchant-")
+
+
+def test_failing_recorder_does_not_block_settlement():
+    class BrokenRecorder:
+        def record(self, *args):
+            raise RuntimeError("disk full")
+
+    async def processor(body: bytes) -> None:
+        pass
+
+    consumer = RabbitMQConsumer("queue", processor, recorder=BrokenRecorder())
+    message = InMemoryMessage(b"{}")
+
+    asyncio.run(consumer.process_message(message))
+
+    assert message.outcome == "acked"
+
+
+def test_recording_replays_through_consumers(tmp_path):
+    recording_path = str(tmp_path / "recording.gz")
+    recorder = MessageRecorder(recording_path)
+    recorder.record(
+        "create_user_xml", b'{"merchant_id":"m1","store_name":"Shop"}'
+    )
+    recorder.record(
+        "add_new_offer_to_xml",
+        json.dumps(
+            {
+                "merchant_id": "m1",
+                "offers": [
+                    {
+                        "sku": "s1",
+                        "model": "Model",
+                        "availabilities": [{"store_id": "PP1", "available": True}],
+                    }
+                ],
+            }
+        ).encode(),
+    )
+    recorder.record("delete_offer_xml", b'{"merchant_id":"m1","sku":"s1"}')
+    recorder.record("delete_offer_xml", b'{"merchant_id":"missing","sku":"s1"}')
+    recorder.close()
+
+    report = asyncio.run(replay(recording_path, speed=0, max_retries=0))
+
+    assert report["messages"] == 4
+    assert report["outcomes"] == {"acked": 3, "rejected": 1}
+    assert report["retries"] == 0
+    assert report["storage"]["operations"] == {"put_object": 3, "get_object": 3}
+    assert report["stages"]["end_to_end"]["count"] == 4
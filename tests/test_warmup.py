@@ -0,0 +1,112 @@
+import asyncio
+import json
+import sys
+
+from src.config import settings
+from src.processes import XMLMessageProcessor
+from src.replay.stubs import InMemoryStorageClient
+from src.services import CatalogCache
+from src.warmup import MerchantActivityTracker, warm_up_catalogs
+
+
+def test_frequent_and_recent_merchants_rank_first(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.warmup.time.time", lambda: now[0])
+    tracker = MerchantActivityTracker(
+        str(tmp_path / "activity.json"), half_life_seconds=60
+    )
+
+    for _ in range(4):
+        tracker.touch("busy-yesterday")
+    now[0] += 600
+    tracker.touch("quiet-now")
+    tracker.touch("busy-now")
+    tracker.touch("busy-now")
+
+    assert tracker.top(2) == ["busy-now", "quiet-now"]
+
+
+def test_ranking_survives_reload(tmp_path):
+    state_path = str(tmp_path / "activity.json")
+    tracker = MerchantActivityTracker(state_path, save_every=1000)
+    for merchant_id in ["a", "b", "b", "c", "c", "c"]:
+        tracker.touch(merchant_id)
+    tracker.save()
+
+    reloaded = MerchantActivityTracker(state_path)
+
+    assert reloaded.top(3) == ["c", "b", "a"]
+
+
+def test_save_keeps_top_entries_only(tmp_path):
+    state_path = str(tmp_path / "activity.json")
+    tracker = MerchantActivityTracker(state_path, max_entries=2, save_every=1000)
+    for merchant_id in ["a", "b", "b", "c", "c", "c"]:
+        tracker.touch(merchant_id)
+    tracker.save()
+
+    assert MerchantActivityTracker(state_path).top(10) == ["c", "b"]
+
+
+def test_malformed_state_falls_back_to_empty(tmp_path):
+    state_path = tmp_path / "activity.json"
+
+    for content in ["[1, 2]", "{not json", json.dumps({"a": "x", "b": [1, 2, 3]})]:
+        state_path.write_text(content)
+        assert MerchantActivityTracker(str(state_path)).top(5) == []
+
+    state_path.write_text(json.dumps({"a": [1, 2], "b": "x"}))
+    assert MerchantActivityTracker(str(state_path)).top(5) == ["a"]
+
+
+def test_unreadable_state_falls_back_to_empty(tmp_path):
+    state_path = tmp_path / "activity.json"
+    state_path.mkdir()
+
+    assert MerchantActivityTracker(str(state_path)).top(5) == []
+
+
+def test_warm_up_stays_within_memory_budget():
+    processor = XMLMessageProcessor()
+    processor.gcp_service.client = InMemoryStorageClient()
+    content = "<catalog>" + "ж" * 1000 + "</catalog>"
+    for merchant_id in "abcde":
+        processor.gcp_service.client.seed(
+            processor.catalog_destination(merchant_id), content
+        )
+    budget = 2 * sys.getsizeof(content)
+    processor.gcp_service.cache = CatalogCache(10 * budget, warm_budget_bytes=budget)
+
+    stats = asyncio.run(warm_up_catalogs(processor, list("abcdef")))
+
+    assert stats["warmed"] == 2
+    assert stats["warmed"] + stats["skipped"] + stats["failed"] == 6
+    assert processor.gcp_service.cache.total_bytes <= budget
+
+
+def test_downloads_finishing_after_deadline_are_not_kept(monkeypatch):
+    monkeypatch.setattr(settings, "WARMUP_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "WARMUP_DEADLINE_SECONDS", 0.3)
+    processor = XMLMessageProcessor()
+    processor.gcp_service.client = InMemoryStorageClient(latency=0.2)
+    for merchant_id in "abcde":
+        processor.gcp_service.client.seed(
+            processor.catalog_destination(merchant_id), "<catalog/>"
+        )
+    cache = CatalogCache(1024 * 1024)
+    processor.gcp_service.cache = cache
+
+    async def scenario():
+        stats = await warm_up_catalogs(processor, list("abcde"))
+        # Let the download still running at the deadline finish in its thread.
+        await asyncio.sleep(0.3)
+        return stats
+
+    stats = asyncio.run(scenario())
+
+    assert stats["warmed"] == 1
+    assert stats["timed_out"] == 4
+    assert processor.gcp_service.client.operations["get_object"] == 2
+    assert cache.stats()["warmed"] == 1
+    assert len(cache.warmed_keys) == 1
+    assert processor.catalog_destination("b") not in cache